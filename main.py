@@ -1,6 +1,6 @@
 import warnings
 import os
-import sys
+import ctypes
 import importlib.util
 import threading
 import time
@@ -11,8 +11,8 @@ from functools import lru_cache
 from interface.components import GameOverlay
 from interface.main_window import MainWindow
 from interface.settings import SettingsManager
-from utils.screen_capture import ScreenCapture
-from utils.system_utils import send_click, check_display_scale
+from utils.screen_capture import DXGIScreenCapture, BGRBuffer
+from utils.system_utils import send_click, enable_dpi_awareness, save_image_async
 from core.detection import find_line_position, VelocityCalculator
 from core.automation import AutomationManager
 from core.notifications import DiscordNotifier
@@ -58,21 +58,8 @@ class LazyImports:
 
 lazy = LazyImports()
 
-# Check dependencies first
-from utils.system_utils import check_dependencies
-check_dependencies()
-
-# Set DPI awareness if on Windows
-if sys.platform == 'win32':
-    try:
-        import ctypes
-        PROCESS_PER_MONITOR_DPI_AWARE = 2
-        ctypes.windll.shcore.SetProcessDpiAwareness(PROCESS_PER_MONITOR_DPI_AWARE)
-    except (AttributeError, OSError):
-        pass
-
 warnings.filterwarnings("ignore")
-check_display_scale()
+enable_dpi_awareness()
 
 
 class DigTool:
@@ -119,7 +106,7 @@ class DigTool:
         self.preview_active = True
         self.overlay = None
         self.overlay_enabled = False
-        self.screen_grabber = ScreenCapture()
+        self.screen_grabber = DXGIScreenCapture()
         
         # Counters and timing
         self.click_count = 0
@@ -684,7 +671,7 @@ class DigTool:
 
             filename = f"click_{self.click_count + 1:03d}_{int(time.time())}.jpg"
             filepath = os.path.join(self.debug_dir, filename)
-            cv2.imwrite(filepath, debug_img)
+            save_image_async(debug_img, filepath)
 
             self.log_click_debug(self.click_count + 1, line_pos, velocity, acceleration, sweet_spot_start,
                                  sweet_spot_end,
@@ -699,6 +686,11 @@ class DigTool:
         height_80_cached = None
         zone_y2_cached = None
         kernel = np.ones((5, 15), np.uint8)
+        to_bgr = BGRBuffer()
+        # The game area isn't known yet, so this only loads and JIT-compiles the converters; the
+        # per-size pick happens when the area is bound below, never on a detection frame.
+        to_bgr.prepare(8, 8)
+        grab, bound_area = None, None
 
         auto_walk_state = "move"
         move_completed_time = 0
@@ -715,17 +707,27 @@ class DigTool:
                 time.sleep(target_delay)
                 continue
 
-            screenshot = self.screen_grabber.capture(bbox=self.game_area)
-            if screenshot is None:
+            if grab is None or bound_area != self.game_area:
+                bound_area = self.game_area
+                grab = self.screen_grabber.bind(bound_area, bgra=True)
+                left, top, right, bottom = bound_area
+                if int((bottom - top) * 0.80) > 0 and right > left:
+                    to_bgr.prepare(int((bottom - top) * 0.80), right - left)
+            frame = grab() if grab is not None else None
+            if frame is None:
+                grab = None
                 time.sleep(target_delay)
                 continue
+            screenshot = frame[:, :, :3]
 
             height, width = screenshot.shape[:2]
             if height_80_cached is None or height_80_cached != int(height * 0.80):
                 height_80_cached = int(height * 0.80)
                 zone_y2_cached = height_80_cached
 
-            zone_detection_area = screenshot[:height_80_cached, :]
+            # HSV conversion is the one consumer that needs a contiguous 3-channel image; the top rows
+            # of the BGRA frame are packed into a reused buffer by the fastest benchmarked converter.
+            zone_detection_area = to_bgr(frame[:height_80_cached])
             hsv = cv2.cvtColor(zone_detection_area, cv2.COLOR_BGR2HSV)
 
             if not self.is_color_locked:
@@ -788,7 +790,7 @@ class DigTool:
                 self.locked_color_hex = None
                 self.smoothed_zone_x = None
 
-            gray_line_area = cv2.cvtColor(screenshot, cv2.COLOR_BGR2GRAY)
+            gray_line_area = cv2.cvtColor(frame, cv2.COLOR_BGRA2GRAY)
             line_pos = find_line_position(gray_line_area, self.get_param('line_sensitivity'),
                                           self.get_param('line_min_height') / 100.0)
 
@@ -1,7 +1,169 @@
+import ctypes
+import functools
+import time
+import uuid
+import weakref
+from ctypes import wintypes
+
 import cv2
 import numpy as np
 import win32gui, win32ui, win32con
 
+BI_RGB = 0
+DIB_RGB_COLORS = 0
+
+
+class BITMAPINFOHEADER(ctypes.Structure):
+    _fields_ = [("biSize", wintypes.DWORD),
+                ("biWidth", wintypes.LONG),
+                ("biHeight", wintypes.LONG),
+                ("biPlanes", wintypes.WORD),
+                ("biBitCount", wintypes.WORD),
+                ("biCompression", wintypes.DWORD),
+                ("biSizeImage", wintypes.DWORD),
+                ("biXPelsPerMeter", wintypes.LONG),
+                ("biYPelsPerMeter", wintypes.LONG),
+                ("biClrUsed", wintypes.DWORD),
+                ("biClrImportant", wintypes.DWORD)]
+
+
+class BITMAPINFO(ctypes.Structure):
+    _fields_ = [("bmiHeader", BITMAPINFOHEADER),
+                ("bmiColors", wintypes.DWORD * 3)]
+
+
+# A private loader, so these argtypes never clash with other ctypes users of the shared windll.gdi32.
+_gdi32 = ctypes.WinDLL('gdi32', use_last_error=True)
+_gdi32.CreateDIBSection.argtypes = [wintypes.HDC, ctypes.POINTER(BITMAPINFO), wintypes.UINT,
+                                    ctypes.POINTER(ctypes.c_void_p), wintypes.HANDLE, wintypes.DWORD]
+_gdi32.CreateDIBSection.restype = wintypes.HBITMAP
+_gdi32.DeleteObject.argtypes = [wintypes.HGDIOBJ]
+_gdi32.DeleteObject.restype = wintypes.BOOL
+_gdi32.GdiFlush.argtypes = []
+_gdi32.GdiFlush.restype = wintypes.BOOL
+
+
+def create_dib_section(hdc, width, height):
+    # Top-down 32bpp DIB; BitBlt writes straight into the returned ndarray's memory. GDI may batch
+    # the BitBlt, so call GdiFlush() before reading the pixels.
+    bmi = BITMAPINFO()
+    bmi.bmiHeader.biSize = ctypes.sizeof(BITMAPINFOHEADER)
+    bmi.bmiHeader.biWidth = width
+    bmi.bmiHeader.biHeight = -height
+    bmi.bmiHeader.biPlanes = 1
+    bmi.bmiHeader.biBitCount = 32
+    bmi.bmiHeader.biCompression = BI_RGB
+
+    bits = ctypes.c_void_p()
+    hbmp = _gdi32.CreateDIBSection(hdc, ctypes.byref(bmi), DIB_RGB_COLORS, ctypes.byref(bits), None, 0)
+    if not hbmp or not bits.value:
+        raise ctypes.WinError(ctypes.get_last_error())
+
+    buffer = (ctypes.c_uint8 * (width * height * 4)).from_address(bits.value)
+    # Every view of the returned array keeps buffer alive, so the DIB is only freed once the last
+    # frame handed out from it is gone. Owners just deselect it and drop their references.
+    weakref.finalize(buffer, delete_dib_section, hbmp)
+    return hbmp, np.ctypeslib.as_array(buffer).reshape(height, width, 4)
+
+
+def delete_dib_section(hbmp):
+    _gdi32.DeleteObject(hbmp)
+
+
+# --- BGRA -> contiguous BGR ---------------------------------------------------------------------
+# Only for callers that really need a packed 3-channel image; capture() returns a free strided view.
+
+def _bgra_to_bgr_cvtcolor(src, dst):
+    cv2.cvtColor(src, cv2.COLOR_BGRA2BGR, dst=dst)
+
+
+def _bgra_to_bgr_mixchannels(src, dst):
+    cv2.mixChannels([src], [dst], [0, 0, 1, 1, 2, 2])
+
+
+BGRA_TO_BGR_CONVERTERS = [_bgra_to_bgr_cvtcolor, _bgra_to_bgr_mixchannels]
+
+
+prange = None
+
+
+@functools.lru_cache(maxsize=None)
+def _numba_converter():
+    # Imported on first use so app start never pays for loading numba/llvmlite. prange is bound as a
+    # module global so the kernel has no closure variables and cache=True still applies. Any failure
+    # (missing numba, no cache location, ...) just leaves the OpenCV converters.
+    global prange
+    try:
+        from numba import njit, prange
+
+        @njit(parallel=True, cache=True)
+        def _bgra_to_bgr_kernel(src_u32, dst_u8):
+            for i in prange(src_u32.size):
+                v = src_u32[i]
+                dst_u8[3 * i] = v & 0xFF
+                dst_u8[3 * i + 1] = (v >> 8) & 0xFF
+                dst_u8[3 * i + 2] = (v >> 16) & 0xFF
+    except Exception:
+        return None
+
+    def _bgra_to_bgr_numba(src, dst):
+        _bgra_to_bgr_kernel(src.reshape(-1).view(np.uint32), dst.reshape(-1))
+
+    return _bgra_to_bgr_numba
+
+
+def select_bgra_converter(src, dst, rounds=5):
+    # Benchmark every available converter on a real frame and keep the fastest one that
+    # produces the same pixels as cvtColor.
+    reference = cv2.cvtColor(src, cv2.COLOR_BGRA2BGR)
+    converters = list(BGRA_TO_BGR_CONVERTERS)
+    numba_converter = _numba_converter()
+    if numba_converter is not None:
+        converters.append(numba_converter)
+    best, best_time = _bgra_to_bgr_cvtcolor, None
+    for convert in converters:
+        try:
+            # Poison dst first, so a converter that leaves it untouched can't pass on an earlier
+            # candidate's output.
+            np.bitwise_not(reference, out=dst)
+            convert(src, dst)  # warm-up (and JIT compile for numba)
+            if not np.array_equal(dst, reference):
+                continue
+            elapsed = float('inf')
+            for _ in range(rounds):
+                start = time.perf_counter()
+                convert(src, dst)
+                elapsed = min(elapsed, time.perf_counter() - start)
+        except Exception:
+            continue
+        if best_time is None or elapsed < best_time:
+            best, best_time = convert, elapsed
+    return best
+
+
+class BGRBuffer:
+    # Reused contiguous BGR output; the converter is picked again whenever the frame size changes.
+    def __init__(self):
+        self._out = None
+        self._convert = None
+
+    def prepare(self, height, width):
+        # Picks the converter for a frame size ahead of time (JIT-compiling numba on first use), so
+        # the first real frame of that size doesn't pay for the benchmark.
+        if self._out is not None and self._out.shape[:2] == (height, width):
+            return
+        sample = np.random.default_rng(0).integers(0, 256, (height, width, 4), dtype=np.uint8)
+        self._out = np.empty((height, width, 3), dtype=np.uint8)
+        self._convert = select_bgra_converter(sample, self._out)
+
+    def __call__(self, bgra):
+        height, width = bgra.shape[:2]
+        if self._out is None or self._out.shape[:2] != (height, width):
+            self._out = np.empty((height, width, 3), dtype=np.uint8)
+            self._convert = select_bgra_converter(bgra, self._out)
+        self._convert(bgra, self._out)
+        return self._out
+
 
 class ScreenCapture:
     def __init__(self):
@@ -10,6 +172,8 @@ class ScreenCapture:
         self.srcdc = None
         self.memdc = None
         self.bmp = None
+        self._np_view = None
+        self._to_bgr = BGRBuffer()
         self._initialized = False
         self._last_bbox = None
         self._last_width = 0
@@ -20,9 +184,8 @@ class ScreenCapture:
             self.hwindc = win32gui.GetWindowDC(self.hwnd)
             self.srcdc = win32ui.CreateDCFromHandle(self.hwindc)
             self.memdc = self.srcdc.CreateCompatibleDC()
-            self.bmp = win32ui.CreateBitmap()
-            self.bmp.CreateCompatibleBitmap(self.srcdc, width, height)
-            self.memdc.SelectObject(self.bmp)
+            self.bmp, self._np_view = create_dib_section(self.hwindc, width, height)
+            win32gui.SelectObject(self.memdc.GetSafeHdc(), self.bmp)
             self._initialized = True
             self._last_width = width
             self._last_height = height
@@ -50,15 +213,12 @@ class ScreenCapture:
                 self.hwindc = None
         except Exception:
             pass
-        try:
-            if self.bmp:
-                win32gui.DeleteObject(self.bmp.GetHandle())
-                self.bmp = None
-        except Exception:
-            pass
+        # Deleting memdc above deselected the DIB; it is freed once no returned frame refers to it.
+        self._np_view = None
+        self.bmp = None
         self._initialized = False
 
-    def capture(self, bbox=None):
+    def _grab(self, bbox):
         if not bbox: return None
         left, top, right, bottom = bbox
         width, height = right - left, bottom - top
@@ -74,12 +234,576 @@ class ScreenCapture:
 
         try:
             self.memdc.BitBlt((0, 0), (width, height), self.srcdc, (left, top), win32con.SRCCOPY)
-            signedIntsArray = self.bmp.GetBitmapBits(True)
-            img = np.frombuffer(signedIntsArray, dtype='uint8').reshape((height, width, 4))
-            return cv2.cvtColor(img, cv2.COLOR_BGRA2BGR)
+            _gdi32.GdiFlush()
+            return self._np_view
         except Exception:
             self._cleanup()
             return None
 
+    # Both capture variants return views into the DIB: they are overwritten by the next call, so
+    # copy a frame if you need to keep its pixels. A view stays valid memory after the bbox changes.
+    def capture(self, bbox=None):
+        # Non-contiguous BGR view (strides (w*4, 4, 1)); dropping alpha costs nothing.
+        frame = self._grab(bbox)
+        return None if frame is None else frame[:, :, :3]
+
+    def capture_bgra(self, bbox=None):
+        return self._grab(bbox)
+
+    def capture_bgr(self, bbox=None):
+        # Contiguous BGR copy in a reused buffer, for consumers that can't take the strided view.
+        frame = self._grab(bbox)
+        return None if frame is None else self._to_bgr(frame)
+
+    def bind(self, bbox, bgra=False):
+        # Specialised capture for a pinned bbox: the DCs, DIB and output view are set up once and
+        # baked into the closure, so each call is just a BitBlt with no bbox comparisons.
+        # Returns None if the DCs can't be set up; rebind after the bbox changes.
+        if self._grab(bbox) is None: return None
+        left, top, right, bottom = bbox
+        dib = self._np_view
+
+        def capture_bound(_blit=self.memdc.BitBlt, _size=(right - left, bottom - top), _srcdc=self.srcdc,
+                          _src=(left, top), _rop=win32con.SRCCOPY, _flush=_gdi32.GdiFlush,
+                          _frame=dib if bgra else dib[:, :, :3]):
+            # capture()/close() rebuild the DIB or delete its DCs; never blit through stale handles.
+            if self._np_view is not dib: return None
+            try:
+                _blit((0, 0), _size, _srcdc, _src, _rop)
+                _flush()
+            except Exception:
+                self._cleanup()
+                return None
+            return _frame
+
+        return capture_bound
+
+    def close(self):
+        self._cleanup()
+
+
+class WindowCapture:
+    def __init__(self, hwnd):
+        self.hwnd = hwnd
+        self.hwindc = None
+        self.srcdc = None
+        self.memdc = None
+        self.bmp = None
+        self._np_view = None
+        self.width = 0
+        self.height = 0
+        try:
+            self.hwindc = win32gui.GetWindowDC(hwnd)
+            self.srcdc = win32ui.CreateDCFromHandle(self.hwindc)
+            self.memdc = self.srcdc.CreateCompatibleDC()
+            left, top, right, bottom = win32gui.GetWindowRect(hwnd)
+            self.resize(right - left, bottom - top)
+        except Exception:
+            self.close()
+            raise
+
+    def resize(self, width, height):
+        if width <= 0 or height <= 0:
+            raise ValueError(f"Invalid window size {width}x{height}")
+        # Selecting the new DIB deselects the old one, which is freed once earlier frames are dropped.
+        self.bmp, self._np_view = create_dib_section(self.hwindc, width, height)
+        win32gui.SelectObject(self.memdc.GetSafeHdc(), self.bmp)
+        self.width = width
+        self.height = height
+
+    def _grab(self):
+        left, top, right, bottom = win32gui.GetWindowRect(self.hwnd)
+        width, height = right - left, bottom - top
+        if width != self.width or height != self.height:
+            self.resize(width, height)
+        self.memdc.BitBlt((0, 0), (width, height), self.srcdc, (0, 0), win32con.SRCCOPY)
+        _gdi32.GdiFlush()
+        return self._np_view
+
+    # Same contract as ScreenCapture: views into the DIB, overwritten by the next call.
+    def capture(self):
+        return self._grab()[:, :, :3]
+
+    def capture_bgra(self):
+        return self._grab()
+
+    def close(self):
+        try:
+            if self.srcdc:
+                self.srcdc.DeleteDC()
+                self.srcdc = None
+        except Exception:
+            pass
+        try:
+            if self.memdc:
+                self.memdc.DeleteDC()
+                self.memdc = None
+        except Exception:
+            pass
+        try:
+            if self.hwindc:
+                win32gui.ReleaseDC(self.hwnd, self.hwindc)
+                self.hwindc = None
+        except Exception:
+            pass
+        self._np_view = None
+        self.bmp = None
+
+
+# --- DXGI Desktop Duplication -------------------------------------------------------------------
+# Hand-bound COM: every interface pointer is a c_void_p and methods are called through the vtable.
+
+DXGI_ERROR_NOT_FOUND = 0x887A0002
+DXGI_ERROR_ACCESS_LOST = 0x887A0026
+DXGI_ERROR_WAIT_TIMEOUT = 0x887A0027
+DXGI_FORMAT_B8G8R8A8_UNORM = 87
+DXGI_MODE_ROTATION_IDENTITY = 1
+D3D_DRIVER_TYPE_UNKNOWN = 0
+D3D11_SDK_VERSION = 7
+D3D11_USAGE_STAGING = 3
+D3D11_CPU_ACCESS_READ = 0x20000
+D3D11_MAP_READ = 1
+
+# vtable slots
+_QUERY_INTERFACE = 0
+_RELEASE = 2
+_FACTORY1_ENUM_ADAPTERS1 = 12
+_ADAPTER_ENUM_OUTPUTS = 7
+_OUTPUT_GET_DESC = 7
+_OUTPUT1_DUPLICATE_OUTPUT = 22
+_DUPLICATION_ACQUIRE_NEXT_FRAME = 8
+_DUPLICATION_RELEASE_FRAME = 14
+_DEVICE_CREATE_TEXTURE2D = 5
+_CONTEXT_MAP = 14
+_CONTEXT_UNMAP = 15
+_CONTEXT_COPY_SUBRESOURCE_REGION = 46
+
+# Seconds to stay on the GDI fallback before trying to set up duplication again.
+_DXGI_RETRY_INTERVAL = 2.0
+
+# DXGIScreenCapture._acquire() results.
+_FRAME_UNAVAILABLE = 0  # no duplicated image yet, or duplication was lost: use the GDI fallback
+_FRAME_UNCHANGED = 1  # nothing new was presented: the last copied frame is still current
+_FRAME_NEW = 2  # the staging texture holds a new image
+
+
+class GUID(ctypes.Structure):
+    _fields_ = [("Data1", wintypes.DWORD),
+                ("Data2", wintypes.WORD),
+                ("Data3", wintypes.WORD),
+                ("Data4", ctypes.c_ubyte * 8)]
+
+
+def _guid(text):
+    return GUID.from_buffer_copy(uuid.UUID(text).bytes_le)
+
+
+IID_IDXGIFactory1 = _guid("770aae78-f26f-4dba-a829-253c83d1b387")
+IID_IDXGIOutput1 = _guid("00cddea8-939b-4b83-a340-a685226666cc")
+IID_ID3D11Texture2D = _guid("6f15aaf2-d208-4e89-9ab4-489535d34f9c")
+
+
+class DXGI_OUTPUT_DESC(ctypes.Structure):
+    _fields_ = [("DeviceName", ctypes.c_wchar * 32),
+                ("DesktopCoordinates", wintypes.RECT),
+                ("AttachedToDesktop", wintypes.BOOL),
+                ("Rotation", wintypes.UINT),
+                ("Monitor", wintypes.HMONITOR)]
+
+
+class DXGI_OUTDUPL_POINTER_POSITION(ctypes.Structure):
+    _fields_ = [("Position", wintypes.POINT),
+                ("Visible", wintypes.BOOL)]
+
+
+class DXGI_OUTDUPL_FRAME_INFO(ctypes.Structure):
+    _fields_ = [("LastPresentTime", ctypes.c_longlong),
+                ("LastMouseUpdateTime", ctypes.c_longlong),
+                ("AccumulatedFrames", wintypes.UINT),
+                ("RectsCoalesced", wintypes.BOOL),
+                ("ProtectedContentMaskedOut", wintypes.BOOL),
+                ("PointerPosition", DXGI_OUTDUPL_POINTER_POSITION),
+                ("TotalMetadataBufferSize", wintypes.UINT),
+                ("PointerShapeBufferSize", wintypes.UINT)]
+
+
+class DXGI_SAMPLE_DESC(ctypes.Structure):
+    _fields_ = [("Count", wintypes.UINT),
+                ("Quality", wintypes.UINT)]
+
+
+class D3D11_TEXTURE2D_DESC(ctypes.Structure):
+    _fields_ = [("Width", wintypes.UINT),
+                ("Height", wintypes.UINT),
+                ("MipLevels", wintypes.UINT),
+                ("ArraySize", wintypes.UINT),
+                ("Format", wintypes.UINT),
+                ("SampleDesc", DXGI_SAMPLE_DESC),
+                ("Usage", wintypes.UINT),
+                ("BindFlags", wintypes.UINT),
+                ("CPUAccessFlags", wintypes.UINT),
+                ("MiscFlags", wintypes.UINT)]
+
+
+class D3D11_BOX(ctypes.Structure):
+    _fields_ = [("left", wintypes.UINT),
+                ("top", wintypes.UINT),
+                ("front", wintypes.UINT),
+                ("right", wintypes.UINT),
+                ("bottom", wintypes.UINT),
+                ("back", wintypes.UINT)]
+
+
+class D3D11_MAPPED_SUBRESOURCE(ctypes.Structure):
+    _fields_ = [("pData", ctypes.c_void_p),
+                ("RowPitch", wintypes.UINT),
+                ("DepthPitch", wintypes.UINT)]
+
+
+@functools.lru_cache(maxsize=None)
+def _com_prototype(restype, *argtypes):
+    return ctypes.WINFUNCTYPE(restype, ctypes.c_void_p, *argtypes)
+
+
+def _com_method(obj, index, restype, *argtypes):
+    vtable = ctypes.cast(obj, ctypes.POINTER(ctypes.POINTER(ctypes.c_void_p))).contents
+    return functools.partial(_com_prototype(restype, *argtypes)(vtable[index]), obj)
+
+
+def _query_interface(obj, iid):
+    result = ctypes.c_void_p()
+    _check_hr(_com_method(obj, _QUERY_INTERFACE, ctypes.c_long, ctypes.POINTER(GUID),
+                          ctypes.POINTER(ctypes.c_void_p))(ctypes.byref(iid), ctypes.byref(result)),
+              "QueryInterface")
+    return result
+
+
+def _release(obj):
+    if obj is not None and obj.value:
+        _com_method(obj, _RELEASE, wintypes.ULONG)()
+
+
+def _check_hr(hr, what):
+    if hr < 0:
+        raise OSError(f"{what} failed with HRESULT 0x{hr & 0xFFFFFFFF:08X}")
+
+
+def _hr_is(hr, code):
+    return hr & 0xFFFFFFFF == code
+
+
+def _find_output(bbox):
+    # Returns (adapter, output, desktop rect) for the output that fully contains bbox; the caller
+    # owns both COM references.
+    dxgi = ctypes.WinDLL('dxgi')
+    dxgi.CreateDXGIFactory1.argtypes = [ctypes.POINTER(GUID), ctypes.POINTER(ctypes.c_void_p)]
+    dxgi.CreateDXGIFactory1.restype = ctypes.c_long
+
+    factory = ctypes.c_void_p()
+    _check_hr(dxgi.CreateDXGIFactory1(ctypes.byref(IID_IDXGIFactory1), ctypes.byref(factory)),
+              "CreateDXGIFactory1")
+    try:
+        enum_adapters = _com_method(factory, _FACTORY1_ENUM_ADAPTERS1, ctypes.c_long,
+                                    wintypes.UINT, ctypes.POINTER(ctypes.c_void_p))
+        left, top, right, bottom = bbox
+        adapter_index = 0
+        adapter = output = None
+        try:
+            while True:
+                adapter = ctypes.c_void_p()
+                hr = enum_adapters(adapter_index, ctypes.byref(adapter))
+                if _hr_is(hr, DXGI_ERROR_NOT_FOUND): break
+                _check_hr(hr, "EnumAdapters1")
+
+                enum_outputs = _com_method(adapter, _ADAPTER_ENUM_OUTPUTS, ctypes.c_long,
+                                           wintypes.UINT, ctypes.POINTER(ctypes.c_void_p))
+                output_index = 0
+                while True:
+                    output = ctypes.c_void_p()
+                    hr = enum_outputs(output_index, ctypes.byref(output))
+                    if _hr_is(hr, DXGI_ERROR_NOT_FOUND): break
+                    _check_hr(hr, "EnumOutputs")
+
+                    desc = DXGI_OUTPUT_DESC()
+                    _check_hr(_com_method(output, _OUTPUT_GET_DESC, ctypes.c_long,
+                                          ctypes.POINTER(DXGI_OUTPUT_DESC))(ctypes.byref(desc)), "GetDesc")
+                    rect = desc.DesktopCoordinates
+                    if (desc.AttachedToDesktop and
+                            desc.Rotation in (0, DXGI_MODE_ROTATION_IDENTITY) and
+                            rect.left <= left and rect.top <= top and right <= rect.right and bottom <= rect.bottom):
+                        return adapter, output, (rect.left, rect.top, rect.right, rect.bottom)
+
+                    _release(output)
+                    output = None
+                    output_index += 1
+
+                _release(adapter)
+                adapter = None
+                adapter_index += 1
+        except Exception:
+            # A failed Enum*/GetDesc call must not leak the references held for this iteration.
+            _release(output)
+            _release(adapter)
+            raise
+    finally:
+        _release(factory)
+
+    raise OSError(f"No duplicable output contains {bbox}")
+
+
+# Drop-in alternative to ScreenCapture: frames come from the compositor instead of a GDI BitBlt,
+# and only the bbox region is copied into a CPU-readable staging texture. Falls back to
+# ScreenCapture whenever duplication is unavailable (pre-Windows 8, bbox spanning monitors,
+# rotated outputs, secure desktop).
+class DXGIScreenCapture:
+    def __init__(self, timeout_ms=0):
+        self.timeout_ms = timeout_ms
+        self._fallback = ScreenCapture()
+        self._to_bgr = BGRBuffer()
+        self._device = None
+        self._context = None
+        self._duplication = None
+        self._staging = None
+        self._frame = None
+        self._output_rect = None
+        self._has_frame = False
+        self._initialized = False
+        self._retry_at = 0.0
+        self._last_bbox = None
+        self._frame_info = DXGI_OUTDUPL_FRAME_INFO()
+        self._mapped = D3D11_MAPPED_SUBRESOURCE()
+        self._box = D3D11_BOX()
+
+    def _initialize(self, bbox):
+        adapter = output = output1 = None
+        try:
+            adapter, output, self._output_rect = _find_output(bbox)
+            output1 = _query_interface(output, IID_IDXGIOutput1)
+
+            d3d11 = ctypes.WinDLL('d3d11')
+            d3d11.D3D11CreateDevice.argtypes = [ctypes.c_void_p, wintypes.UINT, wintypes.HMODULE, wintypes.UINT,
+                                                ctypes.c_void_p, wintypes.UINT, wintypes.UINT,
+                                                ctypes.POINTER(ctypes.c_void_p), ctypes.POINTER(wintypes.UINT),
+                                                ctypes.POINTER(ctypes.c_void_p)]
+            d3d11.D3D11CreateDevice.restype = ctypes.c_long
+
+            self._device, self._context = ctypes.c_void_p(), ctypes.c_void_p()
+            feature_level = wintypes.UINT()
+            _check_hr(d3d11.D3D11CreateDevice(adapter, D3D_DRIVER_TYPE_UNKNOWN, None, 0, None, 0, D3D11_SDK_VERSION,
+                                              ctypes.byref(self._device), ctypes.byref(feature_level),
+                                              ctypes.byref(self._context)), "D3D11CreateDevice")
+
+            self._duplication = ctypes.c_void_p()
+            _check_hr(_com_method(output1, _OUTPUT1_DUPLICATE_OUTPUT, ctypes.c_long, ctypes.c_void_p,
+                                  ctypes.POINTER(ctypes.c_void_p))(self._device, ctypes.byref(self._duplication)),
+                      "DuplicateOutput")
+
+            self._acquire_next_frame = _com_method(self._duplication, _DUPLICATION_ACQUIRE_NEXT_FRAME, ctypes.c_long,
+                                                   wintypes.UINT, ctypes.POINTER(DXGI_OUTDUPL_FRAME_INFO),
+                                                   ctypes.POINTER(ctypes.c_void_p))
+            self._release_frame = _com_method(self._duplication, _DUPLICATION_RELEASE_FRAME, ctypes.c_long)
+            self._copy_subresource_region = _com_method(self._context, _CONTEXT_COPY_SUBRESOURCE_REGION, None,
+                                                        ctypes.c_void_p, wintypes.UINT, wintypes.UINT, wintypes.UINT,
+                                                        wintypes.UINT, ctypes.c_void_p, wintypes.UINT,
+                                                        ctypes.POINTER(D3D11_BOX))
+            self._map = _com_method(self._context, _CONTEXT_MAP, ctypes.c_long, ctypes.c_void_p, wintypes.UINT,
+                                    wintypes.UINT, wintypes.UINT, ctypes.POINTER(D3D11_MAPPED_SUBRESOURCE))
+            self._unmap = _com_method(self._context, _CONTEXT_UNMAP, None, ctypes.c_void_p, wintypes.UINT)
+
+            self._create_staging(bbox)
+            self._initialized = True
+        except Exception:
+            self._cleanup()
+            self._retry_at = time.monotonic() + _DXGI_RETRY_INTERVAL
+            return False
+        finally:
+            _release(output1)
+            _release(output)
+            _release(adapter)
+        return True
+
+    def _create_staging(self, bbox):
+        left, top, right, bottom = bbox
+        width, height = right - left, bottom - top
+        _release(self._staging)
+        self._staging = None
+
+        desc = D3D11_TEXTURE2D_DESC()
+        desc.Width = width
+        desc.Height = height
+        desc.MipLevels = 1
+        desc.ArraySize = 1
+        desc.Format = DXGI_FORMAT_B8G8R8A8_UNORM
+        desc.SampleDesc.Count = 1
+        desc.Usage = D3D11_USAGE_STAGING
+        desc.CPUAccessFlags = D3D11_CPU_ACCESS_READ
+
+        staging = ctypes.c_void_p()
+        _check_hr(_com_method(self._device, _DEVICE_CREATE_TEXTURE2D, ctypes.c_long,
+                              ctypes.POINTER(D3D11_TEXTURE2D_DESC), ctypes.c_void_p,
+                              ctypes.POINTER(ctypes.c_void_p))(ctypes.byref(desc), None, ctypes.byref(staging)),
+                  "CreateTexture2D")
+        self._staging = staging
+
+        # Desktop texture coordinates are relative to the output's top-left corner.
+        out_left, out_top = self._output_rect[:2]
+        self._box.left, self._box.top, self._box.front = left - out_left, top - out_top, 0
+        self._box.right, self._box.bottom, self._box.back = right - out_left, bottom - out_top, 1
+
+        self._frame = np.empty((height, width, 4), dtype=np.uint8)
+        self._has_frame = False
+        self._last_bbox = bbox
+
+    def _cleanup(self):
+        for name in ("_staging", "_duplication", "_context", "_device"):
+            try:
+                _release(getattr(self, name))
+            except Exception:
+                pass
+            setattr(self, name, None)
+        self._frame = None
+        self._has_frame = False
+        self._initialized = False
+        self._last_bbox = None
+
+    def _contains(self, bbox):
+        out_left, out_top, out_right, out_bottom = self._output_rect
+        left, top, right, bottom = bbox
+        return out_left <= left and out_top <= top and right <= out_right and bottom <= out_bottom
+
+    def _acquire(self):
+        resource = ctypes.c_void_p()
+        hr = self._acquire_next_frame(self.timeout_ms, ctypes.byref(self._frame_info), ctypes.byref(resource))
+        if _hr_is(hr, DXGI_ERROR_WAIT_TIMEOUT):
+            return _FRAME_UNCHANGED if self._has_frame else _FRAME_UNAVAILABLE
+        if _hr_is(hr, DXGI_ERROR_ACCESS_LOST):
+            # Mode change, secure desktop or a fullscreen-exclusive app: duplication must be recreated.
+            self._cleanup()
+            return _FRAME_UNAVAILABLE
+        _check_hr(hr, "AcquireNextFrame")
+
+        try:
+            # LastPresentTime == 0 means only the mouse moved, so the image is unchanged.
+            if self._has_frame and not self._frame_info.LastPresentTime:
+                return _FRAME_UNCHANGED
+            texture = _query_interface(resource, IID_ID3D11Texture2D)
+            try:
+                self._copy_subresource_region(self._staging, 0, 0, 0, 0, texture, 0, ctypes.byref(self._box))
+            finally:
+                _release(texture)
+            self._has_frame = True
+        finally:
+            _release(resource)
+            self._release_frame()
+        return _FRAME_NEW
+
+    def _grab(self, bbox):
+        if not bbox: return None
+        left, top, right, bottom = bbox
+        if right - left <= 0 or bottom - top <= 0: return None
+
+        if not self._initialized and time.monotonic() >= self._retry_at:
+            self._initialize(bbox)
+
+        if self._initialized and bbox != self._last_bbox:
+            if self._contains(bbox):
+                try:
+                    self._create_staging(bbox)
+                except Exception:
+                    self._cleanup()
+            else:
+                # The bbox moved to another monitor; look the output up again.
+                self._cleanup()
+                self._initialize(bbox)
+
+        if not self._initialized:
+            return self._fallback.capture_bgra(bbox)
+
+        try:
+            status = self._acquire()
+            if status == _FRAME_UNAVAILABLE:
+                return self._fallback.capture_bgra(bbox)
+            if status == _FRAME_UNCHANGED:
+                # self._frame already holds what the staging texture has; skip the Map and copy.
+                return self._frame
+
+            _check_hr(self._map(self._staging, 0, D3D11_MAP_READ, 0, ctypes.byref(self._mapped)), "Map")
+            try:
+                height, width = self._frame.shape[:2]
+                row_pitch = self._mapped.RowPitch
+                rows = (ctypes.c_uint8 * (row_pitch * height)).from_address(self._mapped.pData)
+                mapped = np.ctypeslib.as_array(rows).reshape(height, row_pitch // 4, 4)
+                np.copyto(self._frame, mapped[:, :width])
+            finally:
+                self._unmap(self._staging, 0)
+            return self._frame
+        except Exception:
+            self._cleanup()
+            self._retry_at = time.monotonic() + _DXGI_RETRY_INTERVAL
+            return self._fallback.capture_bgra(bbox)
+
+    # Same contract as ScreenCapture: the frame buffer is reused and overwritten by the next call.
+    def capture(self, bbox=None):
+        frame = self._grab(bbox)
+        return None if frame is None else frame[:, :, :3]
+
+    def capture_bgra(self, bbox=None):
+        return self._grab(bbox)
+
+    def capture_bgr(self, bbox=None):
+        frame = self._grab(bbox)
+        return None if frame is None else self._to_bgr(frame)
+
+    def bind(self, bbox, bgra=False):
+        # Specialised steady state for a pinned bbox: while duplication is up, the staging texture,
+        # Map/Unmap and output frame are closure locals and the mapped view is only rebuilt when the
+        # driver hands back a different pointer or pitch. Anything else (first frame, access lost,
+        # GDI fallback, another caller moving the bbox) goes through _grab(), and the closure
+        # re-specialises on the next call once duplication is running again.
+        # Returns None if the first capture fails; rebind after the bbox changes.
+        slow = self.capture_bgra if bgra else self.capture
+        if slow(bbox) is None: return None
+        state = None
+        mapped_view = (None, None, None)
+
+        def capture_bound(_acquire=self._acquire, _mapped=self._mapped, _mapped_ref=ctypes.byref(self._mapped),
+                          _read=D3D11_MAP_READ, _copyto=np.copyto):
+            nonlocal state, mapped_view
+            if state is None or state[0] is not self._staging:
+                frame = slow(bbox)
+                mapped_view = (None, None, None)
+                state = (self._staging, self._map, self._unmap, self._frame,
+                         self._frame if bgra else self._frame[:, :, :3]) if self._initialized else None
+                return frame
+
+            staging, map_, unmap, frame, out = state
+            try:
+                status = _acquire()
+                if status == _FRAME_UNCHANGED:
+                    return out
+                if status == _FRAME_UNAVAILABLE:
+                    state = None
+                    return slow(bbox)
+                _check_hr(map_(staging, 0, _read, 0, _mapped_ref), "Map")
+                try:
+                    if _mapped.pData != mapped_view[0] or _mapped.RowPitch != mapped_view[1]:
+                        height, width = frame.shape[:2]
+                        row_pitch = _mapped.RowPitch
+                        rows = (ctypes.c_uint8 * (row_pitch * height)).from_address(_mapped.pData)
+                        mapped_view = (_mapped.pData, row_pitch,
+                                       np.ctypeslib.as_array(rows).reshape(height, row_pitch // 4, 4)[:, :width])
+                    _copyto(frame, mapped_view[2])
+                finally:
+                    unmap(staging, 0)
+                return out
+            except Exception:
+                self._cleanup()
+                self._retry_at = time.monotonic() + _DXGI_RETRY_INTERVAL
+                state = None
+                return slow(bbox)
+
+        return capture_bound
+
     def close(self):
-        self._cleanup()
\ No newline at end of file
+        self._cleanup()
+        self._fallback.close()
\ No newline at end of file
@@ -1,13 +1,26 @@
-import importlib
+import collections
+import fnmatch
+import functools
+import importlib.util
+import platform
+import re
 
 import cv2
-import numpy as np
-import win32gui, win32ui, win32con, win32api
+import win32gui, win32con, win32api
 import os
 import sys
+import threading
+import time
 import ctypes
-import tkinter as tk
-from tkinter import messagebox
+from concurrent.futures import ThreadPoolExecutor
+
+# Optional: only get_system_info() needs it.
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+from utils.screen_capture import ScreenCapture, WindowCapture  # noqa: F401 (re-exported)
 
 
 def check_dependencies():
@@ -23,9 +36,8 @@ def check_dependencies():
     }
     missing_packages = []
     for module, package in required_packages.items():
-        try:
-            importlib.import_module(module)
-        except ImportError:
+        # find_spec only locates the module, so heavy packages like cv2 aren't imported just to be checked.
+        if importlib.util.find_spec(module) is None:
             missing_packages.append(package)
 
     if missing_packages:
@@ -35,78 +47,73 @@ def check_dependencies():
         print("\nPlease install the missing packages and try again.")
         sys.exit(1)
 
-def check_display_scale():
+DPI_AWARENESS_CONTEXT_PER_MONITOR_AWARE_V2 = -4
+PROCESS_PER_MONITOR_DPI_AWARE = 2
+
+
+def enable_dpi_awareness():
+    # Per-monitor V2 awareness makes GetWindowRect, cursor positions and BitBlt all work in physical
+    # pixels on every monitor, so ScreenCapture needs no scaling and any display scale is supported.
+    # It is set process-wide: a thread-level context wouldn't reach the capture thread.
+    user32 = ctypes.windll.user32
     try:
-        user32 = ctypes.windll.user32
-        user32.SetProcessDPIAware()
+        if user32.SetProcessDpiAwarenessContext(ctypes.c_void_p(DPI_AWARENESS_CONTEXT_PER_MONITOR_AWARE_V2)):
+            return True
+    except (AttributeError, OSError):
+        pass
+    try:
+        # S_OK, or E_ACCESSDENIED when awareness was already set (e.g. by the manifest).
+        if ctypes.windll.shcore.SetProcessDpiAwareness(PROCESS_PER_MONITOR_DPI_AWARE) in (0, -2147024891):
+            return True
+    except (AttributeError, OSError):
+        pass
+    try:
+        return bool(user32.SetProcessDPIAware())
+    except (AttributeError, OSError):
+        return False
 
-        hdc = user32.GetDC(0)
-        dpi = ctypes.windll.gdi32.GetDeviceCaps(hdc, 88)
-        user32.ReleaseDC(0, hdc)
 
-        scale_percent = (dpi * 100) // 96
+INPUT_MOUSE = 0
+MOUSEEVENTF_LEFTDOWN = 0x0002
+MOUSEEVENTF_LEFTUP = 0x0004
 
-        if scale_percent != 100:
-            root = tk.Tk()
-            root.withdraw()
 
-            messagebox.showerror(
-                "Display Scale Error",
-                f"ERROR: Display scale is set to {scale_percent}%. This tool requires 100% display scaling to work correctly."
-            )
+class MOUSEINPUT(ctypes.Structure):
+    _fields_ = [("dx", ctypes.c_long),
+                ("dy", ctypes.c_long),
+                ("mouseData", ctypes.c_uint32),
+                ("dwFlags", ctypes.c_uint32),
+                ("time", ctypes.c_uint32),
+                ("dwExtraInfo", ctypes.c_void_p)]
 
-            root.destroy()
-            sys.exit(1)
 
-    except Exception:
-        pass
+class INPUT(ctypes.Structure):
+    class _INPUT(ctypes.Union):
+        _fields_ = [("mi", MOUSEINPUT)]
 
+    _anonymous_ = ("_input",)
+    _fields_ = [("type", ctypes.c_uint32),
+                ("_input", _INPUT)]
 
-def send_click():
-    try:
-        user32 = ctypes.windll.user32
 
-        INPUT_MOUSE = 0
-        MOUSEEVENTF_LEFTDOWN = 0x0002
-        MOUSEEVENTF_LEFTUP = 0x0004
-
-        class MOUSEINPUT(ctypes.Structure):
-            _fields_ = [("dx", ctypes.c_long),
-                        ("dy", ctypes.c_long),
-                        ("mouseData", ctypes.wintypes.DWORD),
-                        ("dwFlags", ctypes.wintypes.DWORD),
-                        ("time", ctypes.wintypes.DWORD),
-                        ("dwExtraInfo", ctypes.POINTER(ctypes.wintypes.ULONG))]
-
-        class INPUT(ctypes.Structure):
-            class _INPUT(ctypes.Union):
-                _fields_ = [("mi", MOUSEINPUT)]
-
-            _anonymous_ = ("_input",)
-            _fields_ = [("type", ctypes.wintypes.DWORD),
-                        ("_input", _INPUT)]
-
-        input_down = INPUT()
-        input_down.type = INPUT_MOUSE
-        input_down.mi.dx = 0
-        input_down.mi.dy = 0
-        input_down.mi.mouseData = 0
-        input_down.mi.dwFlags = MOUSEEVENTF_LEFTDOWN
-        input_down.mi.time = 0
-        input_down.mi.dwExtraInfo = None
-
-        input_up = INPUT()
-        input_up.type = INPUT_MOUSE
-        input_up.mi.dx = 0
-        input_up.mi.dy = 0
-        input_up.mi.mouseData = 0
-        input_up.mi.dwFlags = MOUSEEVENTF_LEFTUP
-        input_up.mi.time = 0
-        input_up.mi.dwExtraInfo = None
-
-        inputs = (INPUT * 2)(input_down, input_up)
-        user32.SendInput(2, inputs, ctypes.sizeof(INPUT))
+# The down/up pair never changes, so it is built once and handed to SendInput as-is.
+_INPUTS = (INPUT * 2)()
+_INPUTS[0].type = INPUT_MOUSE
+_INPUTS[0].mi.dwFlags = MOUSEEVENTF_LEFTDOWN
+_INPUTS[1].type = INPUT_MOUSE
+_INPUTS[1].mi.dwFlags = MOUSEEVENTF_LEFTUP
+_INPUT_SIZE = ctypes.sizeof(INPUT)
+
+# Bound through a private loader: argtypes set on the shared windll.user32.SendInput would leak to
+# (or be overwritten by) pynput and any other ctypes user in the process.
+_SendInput = ctypes.WinDLL('user32', use_last_error=True).SendInput
+_SendInput.argtypes = [ctypes.c_uint32, ctypes.POINTER(INPUT), ctypes.c_int]
+_SendInput.restype = ctypes.c_uint32
 
+
+def send_click():
+    try:
+        _SendInput(2, _INPUTS, _INPUT_SIZE)
     except Exception as e:
         try:
             win32api.mouse_event(win32con.MOUSEEVENTF_LEFTDOWN, 0, 0, 0, 0)
@@ -115,72 +122,14 @@ def send_click():
             print(f"Click failed: {e}, {e2}")
 
 
-class ScreenCapture:
-    def __init__(self):
-        self.hwnd = win32gui.GetDesktopWindow()
-        self.hwindc = None
-        self.srcdc = None
-        self.memdc = None
-        self.bmp = None
-        self._initialized = False
-        self._last_bbox = None
-        self._last_width = 0
-        self._last_height = 0
+_WINDOW_CACHE = {'ts': float('-inf'), 'items': [], 'items_by_title': {}}
 
-    def _initialize_dc(self, width, height):
-        try:
-            self.hwindc = win32gui.GetWindowDC(self.hwnd)
-            self.srcdc = win32ui.CreateDCFromHandle(self.hwindc)
-            self.memdc = self.srcdc.CreateCompatibleDC()
-            self.bmp = win32ui.CreateBitmap()
-            self.bmp.CreateCompatibleBitmap(self.srcdc, width, height)
-            self.memdc.SelectObject(self.bmp)
-            self._initialized = True
-            self._last_width = width
-            self._last_height = height
-        except Exception:
-            self._cleanup()
-            return False
-        return True
-
-    def _cleanup(self):
-        try:
-            if self.srcdc: self.srcdc.DeleteDC()
-            if self.memdc: self.memdc.DeleteDC()
-            if self.hwindc: win32gui.ReleaseDC(self.hwnd, self.hwindc)
-            if self.bmp: win32gui.DeleteObject(self.bmp.GetHandle())
-        except Exception:
-            pass
-        self._initialized = False
-
-    def capture(self, bbox=None):
-        if not bbox: return None
-        left, top, right, bottom = bbox
-        width, height = right - left, bottom - top
-        if width <= 0 or height <= 0: return None
-
-        if (self._last_bbox != bbox or not self._initialized or
-                width != self._last_width or height != self._last_height):
-            self._cleanup()
-            self._last_bbox = bbox
-
-        if not self._initialized:
-            if not self._initialize_dc(width, height): return None
-
-        try:
-            self.memdc.BitBlt((0, 0), (width, height), self.srcdc, (left, top), win32con.SRCCOPY)
-            signedIntsArray = self.bmp.GetBitmapBits(True)
-            img = np.frombuffer(signedIntsArray, dtype='uint8').reshape((height, width, 4))
-            return cv2.cvtColor(img, cv2.COLOR_BGRA2BGR)
-        except Exception:
-            self._cleanup()
-            return None
 
-    def close(self):
-        self._cleanup()
+def _refresh_window_cache(max_age_ms):
+    now = time.perf_counter()
+    if (now - _WINDOW_CACHE['ts']) * 1000 <= max_age_ms:
+        return _WINDOW_CACHE
 
-
-def get_window_list():
     windows = []
 
     def enum_windows_callback(hwnd, windows_list):
@@ -191,6 +140,7 @@ def get_window_list():
                 windows_list.append({
                     'hwnd': hwnd,
                     'title': window_text,
+                    'title_lower': window_text.lower(),
                     'rect': rect,
                     'width': rect[2] - rect[0],
                     'height': rect[3] - rect[1]
@@ -198,7 +148,20 @@ def get_window_list():
         return True
 
     win32gui.EnumWindows(enum_windows_callback, windows)
-    return windows
+
+    items_by_title = {}
+    for window in windows:
+        items_by_title.setdefault(window['title'], window)
+
+    _WINDOW_CACHE['ts'] = now
+    _WINDOW_CACHE['items'] = windows
+    _WINDOW_CACHE['items_by_title'] = items_by_title
+    return _WINDOW_CACHE
+
+
+def get_window_list(max_age_ms=250):
+    # Fresh dicts, so callers editing them can't change what find_window_by_title sees.
+    return [dict(window) for window in _refresh_window_cache(max_age_ms)['items']]
 
 
 def focus_window(hwnd):
@@ -232,61 +195,77 @@ def get_window_info(hwnd):
         return None
 
 
-def find_window_by_title(title_pattern, exact_match=False):
-    windows = get_window_list()
+def find_window_by_title(title_pattern, exact_match=False, max_age_ms=250):
+    cache = _refresh_window_cache(max_age_ms)
 
-    for window in windows:
-        if exact_match:
-            if window['title'] == title_pattern:
-                return window
-        else:
-            if title_pattern.lower() in window['title'].lower():
-                return window
+    if exact_match:
+        window = cache['items_by_title'].get(title_pattern)
+        return dict(window) if window is not None else None
+
+    pattern = title_pattern.lower()
+    for window in cache['items']:
+        if pattern in window['title_lower']:
+            return dict(window)
 
     return None
 
 
-def capture_window(hwnd):
-    try:
-        rect = win32gui.GetWindowRect(hwnd)
-        width = rect[2] - rect[0]
-        height = rect[3] - rect[1]
+_WINDOW_CAPTURES = collections.OrderedDict()
+_WINDOW_CAPTURES_MAX = 4
+_WINDOW_CAPTURES_LOCK = threading.Lock()
 
-        hwindc = win32gui.GetWindowDC(hwnd)
-        srcdc = win32ui.CreateDCFromHandle(hwindc)
-        memdc = srcdc.CreateCompatibleDC()
-        bmp = win32ui.CreateBitmap()
-        bmp.CreateCompatibleBitmap(srcdc, width, height)
-        memdc.SelectObject(bmp)
 
-        memdc.BitBlt((0, 0), (width, height), srcdc, (0, 0), win32con.SRCCOPY)
+def capture_window(hwnd):
+    # Thread-safe: the cached WindowCapture objects share DCs and DIBs, so calls are serialised.
+    with _WINDOW_CAPTURES_LOCK:
+        return _capture_window(hwnd)
 
-        signedIntsArray = bmp.GetBitmapBits(True)
-        img = np.frombuffer(signedIntsArray, dtype='uint8').reshape((height, width, 4))
-        img = cv2.cvtColor(img, cv2.COLOR_BGRA2BGR)
 
-        srcdc.DeleteDC()
-        memdc.DeleteDC()
-        win32gui.ReleaseDC(hwnd, hwindc)
-        win32gui.DeleteObject(bmp.GetHandle())
+def _capture_window(hwnd):
+    try:
+        capture = _WINDOW_CAPTURES.get(hwnd)
+        if capture is None:
+            capture = WindowCapture(hwnd)
+            _WINDOW_CAPTURES[hwnd] = capture
+            if len(_WINDOW_CAPTURES) > _WINDOW_CAPTURES_MAX:
+                _WINDOW_CAPTURES.popitem(last=False)[1].close()
+        else:
+            _WINDOW_CAPTURES.move_to_end(hwnd)
 
-        return img
+        # Convert into a fresh array so the result outlives eviction of the cached capture.
+        return cv2.cvtColor(capture.capture_bgra(), cv2.COLOR_BGRA2BGR)
 
     except Exception as e:
+        stale = _WINDOW_CAPTURES.pop(hwnd, None)
+        if stale is not None:
+            stale.close()
         print(f"Window capture failed: {e}")
         return None
 
 
+_SCREEN_RES_CACHE = None
+
+
 def get_screen_resolution():
+    global _SCREEN_RES_CACHE
+    if _SCREEN_RES_CACHE is not None:
+        return _SCREEN_RES_CACHE
     try:
         user32 = ctypes.windll.user32
         width = user32.GetSystemMetrics(0)
         height = user32.GetSystemMetrics(1)
-        return width, height
+        _SCREEN_RES_CACHE = (width, height)
+        return _SCREEN_RES_CACHE
     except Exception:
         return 1920, 1080
 
 
+def invalidate_screen_resolution():
+    # Call on WM_DISPLAYCHANGE (resolution or monitor layout change) to re-query the metrics.
+    global _SCREEN_RES_CACHE
+    _SCREEN_RES_CACHE = None
+
+
 def is_point_in_rect(point, rect):
     x, y = point
     left, top, right, bottom = rect
@@ -326,12 +305,43 @@ def clamp_rect_to_screen(rect):
     return (left, top, right, bottom)
 
 
+_IO_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="image-io")
+
+
+def _encode_image(image, filepath, quality):
+    ext = os.path.splitext(filepath)[1].lower()
+    params = [cv2.IMWRITE_JPEG_QUALITY, quality] if ext in ('.jpg', '.jpeg') else []
+    ok, buf = cv2.imencode(ext, image, params)
+    if not ok:
+        raise ValueError(f"Could not encode image as {ext or 'unknown format'}")
+    return buf
+
+
+def _write_bytes(filepath, data):
+    try:
+        with open(filepath, 'wb') as f:
+            f.write(data)
+    except Exception as e:
+        print(f"Failed to save image: {e}")
+
+
 def save_image(image, filepath, quality=95):
     try:
-        if filepath.lower().endswith('.jpg') or filepath.lower().endswith('.jpeg'):
-            cv2.imwrite(filepath, image, [cv2.IMWRITE_JPEG_QUALITY, quality])
-        else:
-            cv2.imwrite(filepath, image)
+        buf = _encode_image(image, filepath, quality)
+        with open(filepath, 'wb') as f:
+            f.write(buf)
+        return True
+    except Exception as e:
+        print(f"Failed to save image: {e}")
+        return False
+
+
+def save_image_async(image, filepath, quality=95):
+    # Encodes on the calling thread (so the caller may reuse image right away) and hands the
+    # disk write to the I/O pool; write errors are reported from the worker.
+    try:
+        buf = _encode_image(image, filepath, quality)
+        _IO_POOL.submit(_write_bytes, filepath, buf)
         return True
     except Exception as e:
         print(f"Failed to save image: {e}")
@@ -359,11 +369,12 @@ def resize_image(image, target_size, maintain_aspect=True):
             resized = cv2.resize(image, (new_w, new_h), interpolation=cv2.INTER_AREA)
 
             if new_w != target_w or new_h != target_h:
-                canvas = np.zeros((target_h, target_w, 3), dtype=np.uint8)
-                y_offset = (target_h - new_h) // 2
-                x_offset = (target_w - new_w) // 2
-                canvas[y_offset:y_offset + new_h, x_offset:x_offset + new_w] = resized
-                return canvas
+                # Only the letterbox border is filled, instead of zeroing a whole canvas and pasting over it.
+                top = (target_h - new_h) // 2
+                bottom = target_h - new_h - top
+                left = (target_w - new_w) // 2
+                right = target_w - new_w - left
+                return cv2.copyMakeBorder(resized, top, bottom, left, right, cv2.BORDER_CONSTANT, value=(0, 0, 0))
             else:
                 return resized
         else:
@@ -384,33 +395,36 @@ def create_directory(path):
 
 
 def get_file_timestamp():
-    import time
     return int(time.time())
 
 
 def format_timestamp(timestamp=None):
-    import time
     if timestamp is None:
         timestamp = time.time()
     return time.strftime('%Y%m%d_%H%M%S', time.localtime(timestamp))
 
 
 def cleanup_old_files(directory, pattern, max_age_days=7):
-    import glob
-    import time
-
     try:
         cutoff_time = time.time() - (max_age_days * 24 * 60 * 60)
-        files = glob.glob(os.path.join(directory, pattern))
+        # Same case rules as glob; DirEntry.stat() reuses the directory listing's data on Windows.
+        # Like glob, wildcards don't match dot-files unless the pattern itself starts with '.'.
+        # Only the directory's own entries are matched: a pattern with a directory part
+        # ('sub/*.jpg') matches nothing, so pass that directory instead.
+        match = re.compile(fnmatch.translate(os.path.normcase(pattern))).match
+        include_hidden = pattern.startswith('.')
 
         deleted_count = 0
-        for file_path in files:
-            try:
-                if os.path.getmtime(file_path) < cutoff_time:
-                    os.remove(file_path)
-                    deleted_count += 1
-            except Exception:
-                continue
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                try:
+                    if (match(os.path.normcase(entry.name)) and
+                            (include_hidden or not entry.name.startswith('.')) and entry.is_file() and
+                            entry.stat().st_mtime < cutoff_time):
+                        os.remove(entry.path)
+                        deleted_count += 1
+                except Exception:
+                    continue
 
         return deleted_count
     except Exception as e:
@@ -418,40 +432,48 @@ def cleanup_old_files(directory, pattern, max_age_days=7):
         return 0
 
 
+_STATIC_SYS_INFO = None
+
+
 def get_system_info():
+    global _STATIC_SYS_INFO
     try:
-        import platform
-        import psutil
-
-        info = {
-            'os': platform.system(),
-            'os_version': platform.version(),
-            'machine': platform.machine(),
-            'processor': platform.processor(),
-            'cpu_count': psutil.cpu_count(),
-            'memory_total': psutil.virtual_memory().total,
-            'memory_available': psutil.virtual_memory().available,
+        if psutil is None:
+            raise ImportError("psutil is not installed")
+
+        # These cannot change while the process runs, and platform.processor()/version() may shell out.
+        if _STATIC_SYS_INFO is None:
+            _STATIC_SYS_INFO = {
+                'os': platform.system(),
+                'os_version': platform.version(),
+                'machine': platform.machine(),
+                'processor': platform.processor(),
+                'cpu_count': psutil.cpu_count()
+            }
+
+        vm = psutil.virtual_memory()
+        return {
+            **_STATIC_SYS_INFO,
+            'memory_total': vm.total,
+            'memory_available': vm.available,
             'screen_resolution': get_screen_resolution()
         }
-        return info
     except Exception as e:
         print(f"Failed to get system info: {e}")
         return {}
 
 
 def log_performance(func):
-    import time
-    import functools
-
+    # One 60 FPS frame (16.67ms) in integer nanoseconds; the counter and threshold are bound as
+    # defaults so the fast path does no global/attribute lookups or float math.
     @functools.wraps(func)
-    def wrapper(*args, **kwargs):
-        start_time = time.perf_counter()
+    def wrapper(*args, _perf_counter_ns=time.perf_counter_ns, _threshold_ns=16_670_000, **kwargs):
+        start_time = _perf_counter_ns()
         result = func(*args, **kwargs)
-        end_time = time.perf_counter()
-        execution_time = (end_time - start_time) * 1000
+        elapsed_ns = _perf_counter_ns() - start_time
 
-        if execution_time > 16.67:
-            print(f"Performance warning: {func.__name__} took {execution_time:.2f}ms")
+        if elapsed_ns > _threshold_ns:
+            print(f"Performance warning: {func.__name__} took {elapsed_ns / 1e6:.2f}ms")
 
         return result
 
@@ -461,32 +483,31 @@ def log_performance(func):
 class PerformanceMonitor:
     def __init__(self, window_size=100):
         self.window_size = window_size
-        self.frame_times = []
+        self.frame_times = collections.deque(maxlen=window_size)
+        self._sum = 0.0
         self.last_time = None
 
     def tick(self):
-        import time
         current_time = time.perf_counter()
 
         if self.last_time is not None:
             frame_time = current_time - self.last_time
+            # The deque evicts the oldest sample on append, so take it out of the running sum first.
+            if self.frame_times and len(self.frame_times) == self.frame_times.maxlen:
+                self._sum -= self.frame_times[0]
+            self._sum += frame_time
             self.frame_times.append(frame_time)
 
-            if len(self.frame_times) > self.window_size:
-                self.frame_times.pop(0)
-
         self.last_time = current_time
 
     def get_fps(self):
         if not self.frame_times:
             return 0
 
-        avg_frame_time = sum(self.frame_times) / len(self.frame_times)
-        return 1.0 / avg_frame_time if avg_frame_time > 0 else 0
+        return len(self.frame_times) / self._sum if self._sum > 0 else 0
 
     def get_frame_time_ms(self):
         if not self.frame_times:
             return 0
 
-        avg_frame_time = sum(self.frame_times) / len(self.frame_times)
-        return avg_frame_time * 1000
\ No newline at end of file
+        return self._sum / len(self.frame_times) * 1000
\ No newline at end of file